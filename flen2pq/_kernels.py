@@ -0,0 +1,313 @@
+"""Numba kernels parsing fixed-width fields straight from the raw row bytes.
+
+Every kernel reads the rows of a block as a flat ``uint8`` buffer plus the start
+and end of each row found by find_rows, so rows of uneven length (short last
+line, ``\\r\\n``) are handled without copying them. Fields falling past the end of a row are treated
+as truncated. The kernels release the GIL, so chunks are parsed in parallel by
+running them on several threads.
+
+Numeric and date fields are decoded by parse_fields, driven by the layout of the
+file as parallel arrays. When the package is built with setup.py, it calls the
+compiled column functions of flen2pq._parse instead.
+"""
+import numpy as np
+from numba import njit
+
+try:
+    from flen2pq import _parse
+except ImportError:
+    _parse = None
+
+ZERO = 48
+NEWLINE = 10
+SPACE = 32
+TAB = 9
+PLUS = 43
+MINUS = 45
+CR = 13
+DOT = 46
+UPPER_E = 69
+LOWER_E = 101
+LOWER_I = 105
+
+MICROSECONDS_PER_DAY = 86400 * 1000000
+
+# Integers are accumulated as negative numbers, whose range also holds the int64 minimum. An
+# accumulator below the limit, or at it before a digit above the last one, overflows
+INT64_MIN = -2 ** 63
+OVERFLOW_LIMIT = -(2 ** 63 // 10)
+OVERFLOW_LAST_DIGIT = 2 ** 63 % 10
+
+# Powers of ten exactly representable as doubles, and the largest exact integer mantissa
+POWERS_OF_TEN = np.array([10.0 ** k for k in range(23)])
+MAX_EXACT_MANTISSA = 2 ** 53
+
+# Outcome of parse_float_field besides a parsed value
+NOT_A_NUMBER = 0
+PARSED = 1
+INEXACT = 2
+
+
+@njit(inline='always')
+def parse_int_field(buf, lo, hi):
+    """Parse an optionally signed, blank padded ASCII integer in buf[lo:hi]. Return (value, ok)."""
+    while lo < hi and (buf[lo] == SPACE or buf[lo] == TAB):
+        lo += 1
+    while hi > lo and (buf[hi - 1] == SPACE or buf[hi - 1] == TAB):
+        hi -= 1
+
+    negative = False
+    if lo < hi and (buf[lo] == PLUS or buf[lo] == MINUS):
+        negative = buf[lo] == MINUS
+        lo += 1
+    if lo >= hi:
+        return 0, False
+
+    value = 0
+    for k in range(lo, hi):
+        digit = np.int64(buf[k]) - ZERO
+        if digit < 0 or digit > 9:
+            return 0, False
+        if value < OVERFLOW_LIMIT or (value == OVERFLOW_LIMIT and digit > OVERFLOW_LAST_DIGIT):
+            return 0, False
+        value = value * 10 - digit
+    if not negative:
+        if value == INT64_MIN:
+            return 0, False
+        value = -value
+    return value, True
+
+
+@njit(inline='always')
+def is_blank(byte):
+    # ASCII whitespace, as trimmed by pc.utf8_trim_whitespace
+    return byte == SPACE or TAB <= byte <= CR
+
+
+@njit(inline='always')
+def days_in_month(year, month):
+    if month == 2:
+        leap = year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+        return 29 if leap else 28
+    if month == 4 or month == 6 or month == 9 or month == 11:
+        return 30
+    return 31
+
+
+@njit(inline='always')
+def days_from_civil(year, month, day):
+    """Days since 1970-01-01 of a proleptic Gregorian date with a non-negative year."""
+    if month <= 2:
+        year -= 1
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month - 3 if month > 2 else month + 9) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+@njit(nogil=True, cache=True)
+def count_lines(buf):
+    # Upper bound of the number of rows of buf, sizing the arrays filled by find_rows
+    lines = 1
+    for k in range(buf.shape[0]):
+        if buf[k] == NEWLINE:
+            lines += 1
+    return lines
+
+
+@njit(nogil=True, cache=True)
+def find_rows(buf, row_starts, row_ends):
+    """Store the bounds of the rows of buf, without their line break, skipping blank lines.
+
+    Return the number of rows and whether buf is all ASCII.
+    """
+    rows_count = 0
+    ascii = True
+    start = 0
+    size = buf.shape[0]
+    while start < size:
+        blank = True
+        end = start
+        while end < size and buf[end] != NEWLINE:
+            if buf[end] >= 128:
+                ascii = False
+                blank = False
+            elif not is_blank(buf[end]):
+                blank = False
+            end += 1
+        next_start = end + 1
+        # Drop the \\r of \\r\\n line breaks
+        while end > start and buf[end - 1] == CR:
+            end -= 1
+        if not blank:
+            row_starts[rows_count] = start
+            row_ends[rows_count] = end
+            rows_count += 1
+        start = next_start
+    return rows_count, ascii
+
+
+@njit(inline='always')
+def parse_float_field(buf, lo, hi):
+    """Parse a blank padded decimal number in buf[lo:hi]. Return (value, outcome).
+
+    Accepts the literals matched by FLOAT_PATTERN in flen2pq. The value is only computed when
+    the mantissa and the power of ten are both exact doubles, so that a single rounding gives
+    the correctly rounded result; other numbers are reported as INEXACT, and so are infinities.
+    """
+    while lo < hi and is_blank(buf[lo]):
+        lo += 1
+    while hi > lo and is_blank(buf[hi - 1]):
+        hi -= 1
+
+    negative = False
+    if lo < hi and (buf[lo] == PLUS or buf[lo] == MINUS):
+        negative = buf[lo] == MINUS
+        lo += 1
+
+    mantissa = 0
+    exponent = 0
+    digits = 0
+    exact = True
+    while lo < hi and ZERO <= buf[lo] <= ZERO + 9:
+        if mantissa < MAX_EXACT_MANTISSA:
+            mantissa = mantissa * 10 + (np.int64(buf[lo]) - ZERO)
+        else:
+            exact = False
+        digits += 1
+        lo += 1
+    if lo < hi and buf[lo] == DOT:
+        lo += 1
+        while lo < hi and ZERO <= buf[lo] <= ZERO + 9:
+            if mantissa < MAX_EXACT_MANTISSA:
+                mantissa = mantissa * 10 + (np.int64(buf[lo]) - ZERO)
+                exponent -= 1
+            else:
+                exact = False
+            digits += 1
+            lo += 1
+    if digits == 0:
+        # Leave inf and infinity, in any case, to the Arrow parser
+        if lo < hi and buf[lo] | 32 == LOWER_I:
+            return 0.0, INEXACT
+        return 0.0, NOT_A_NUMBER
+
+    if lo < hi and (buf[lo] == UPPER_E or buf[lo] == LOWER_E):
+        lo += 1
+        exponent_negative = False
+        if lo < hi and (buf[lo] == PLUS or buf[lo] == MINUS):
+            exponent_negative = buf[lo] == MINUS
+            lo += 1
+        if lo == hi:
+            return 0.0, NOT_A_NUMBER
+        written = 0
+        while lo < hi and ZERO <= buf[lo] <= ZERO + 9:
+            # Anything this large is far outside the exact range anyway
+            written = min(written * 10 + (np.int64(buf[lo]) - ZERO), 100000)
+            lo += 1
+        exponent += -written if exponent_negative else written
+    if lo != hi:
+        return 0.0, NOT_A_NUMBER
+
+    if not exact or mantissa > MAX_EXACT_MANTISSA or exponent < -22 or exponent > 22:
+        return 0.0, INEXACT
+    if exponent < 0:
+        value = mantissa / POWERS_OF_TEN[-exponent]
+    else:
+        value = mantissa * POWERS_OF_TEN[exponent]
+    return -value if negative else value, PARSED
+
+
+@njit(inline='always')
+def parse_date_ymd_field(buf, lo, hi):
+    """Parse a blank padded %Y%m%d date in buf[lo:hi] into microseconds since the epoch. Return (value, ok)."""
+    while lo < hi and is_blank(buf[lo]):
+        lo += 1
+    while hi > lo and is_blank(buf[hi - 1]):
+        hi -= 1
+    if hi - lo != 8:
+        return 0, False
+
+    value, ok = parse_int_field(buf, lo, hi)
+    # Reject signs, which parse_int_field accepts
+    if not ok or buf[lo] == PLUS or buf[lo] == MINUS:
+        return 0, False
+    year = value // 10000
+    month = value // 100 % 100
+    day = value % 100
+    if month < 1 or month > 12 or day < 1 or day > days_in_month(year, month):
+        return 0, False
+    return days_from_civil(year, month, day) * MICROSECONDS_PER_DAY, True
+
+
+@njit(nogil=True, cache=True)
+def trim_fields(buf, row_starts, row_ends, start, width, field_starts, field_lengths):
+    # Bounds of each field once leading and trailing blanks are dropped
+    for i in range(field_starts.shape[0]):
+        lo = row_starts[i] + start
+        hi = min(lo + width, row_ends[i])
+        while lo < hi and is_blank(buf[lo]):
+            lo += 1
+        while hi > lo and is_blank(buf[hi - 1]):
+            hi -= 1
+        field_starts[i] = lo
+        field_lengths[i] = max(hi - lo, 0)
+
+
+@njit(nogil=True, cache=True)
+def gather_fields(buf, field_starts, value_offsets, out):
+    # Copy each field into the data buffer of an Arrow string array
+    for i in range(field_starts.shape[0]):
+        length = value_offsets[i + 1] - value_offsets[i]
+        out[value_offsets[i]:value_offsets[i + 1]] = buf[field_starts[i]:field_starts[i] + length]
+
+
+# Codes of the field kinds decoded by parse_fields, float and bool share the float parser
+INT_KIND, MONETARY_KIND, DATE_YMD_KIND, FLOAT_KIND = range(4)
+KIND_CODES = {
+    'int': INT_KIND,
+    'fixed_monetary': MONETARY_KIND,
+    'date_ymd': DATE_YMD_KIND,
+    'float': FLOAT_KIND,
+    'bool': FLOAT_KIND,
+}
+
+
+@njit(nogil=True, cache=True)
+def parse_field_rows(buf, row_starts, row_ends, kinds, starts, widths, slots, ints, floats, valid):
+    # Decode every field of a row before moving to the next one
+    for i in range(row_starts.shape[0]):
+        row = row_starts[i]
+        end = row_ends[i]
+        for n in range(kinds.shape[0]):
+            lo = row + starts[n]
+            hi = min(lo + widths[n], end)
+            kind = kinds[n]
+            slot = slots[n]
+            if kind == INT_KIND:
+                ints[slot, i], valid[n, i] = parse_int_field(buf, lo, hi)
+            elif kind == MONETARY_KIND:
+                # Amounts are stored in cents: the last two digits are the decimal part. Dividing by
+                # 100 is correctly rounded, multiplying by 0.01 is not (35 * 0.01 != 0.35)
+                cents, valid[n, i] = parse_int_field(buf, lo, hi)
+                floats[slot, i] = cents / 100.0
+            elif kind == DATE_YMD_KIND:
+                ints[slot, i], valid[n, i] = parse_date_ymd_field(buf, lo, hi)
+            else:
+                floats[slot, i], valid[n, i] = parse_float_field(buf, lo, hi)
+
+
+def parse_fields(buf, row_starts, row_ends, kinds, starts, widths, slots, ints, floats, valid):
+    """Decode the fields of a row layout from the rows of a block.
+
+    The layout is given as parallel arrays holding the KIND_CODES code, offset and width of
+    each field, and the row of ints (int and date_ymd fields) or floats (the other kinds) it
+    is decoded into. valid[n] gets the outcome of field n for every row. With the compiled
+    extension the fields are decoded one column after the other, otherwise by a single Numba
+    loop decoding every field of a row before moving to the next.
+    """
+    if _parse is not None:
+        _parse.parse_fields(buf, row_starts, row_ends, kinds, starts, widths, slots, ints, floats, valid)
+    else:
+        parse_field_rows(buf, row_starts, row_ends, kinds, starts, widths, slots, ints, floats, valid)
@@ -0,0 +1,321 @@
+# cython: boundscheck=False, wraparound=False, cdivision=True
+"""Compiled versions of the column kernels in flen2pq._kernels.
+
+The functions take the same arguments as their Numba counterparts and run the
+whole column loop without the GIL.
+"""
+from libc.stdint cimport INT64_MIN, int8_t, int64_t, uint8_t, uint64_t
+from libc.string cimport memcpy, memset
+
+# The SWAR digit tricks below expect the first byte of a word in its lowest bits, so words are
+# byte swapped when loaded on big-endian machines
+cdef extern from *:
+    """
+    static inline uint64_t flen2pq_from_little_endian(uint64_t word) {
+    #if defined(__BYTE_ORDER__) && __BYTE_ORDER__ == __ORDER_BIG_ENDIAN__
+        return __builtin_bswap64(word);
+    #else
+        return word;
+    #endif
+    }
+    """
+    uint64_t from_little_endian "flen2pq_from_little_endian" (uint64_t word) nogil
+
+cdef enum:
+    ZERO = 48
+    SPACE = 32
+    TAB = 9
+    PLUS = 43
+    MINUS = 45
+    CR = 13
+    DOT = 46
+    UPPER_E = 69
+    LOWER_E = 101
+    LOWER_I = 105
+    # Outcome of parse_float_field besides a parsed value
+    NOT_A_NUMBER = 0
+    PARSED = 1
+    INEXACT = 2
+    # Field kinds, see _kernels.KIND_CODES
+    INT_KIND = 0
+    MONETARY_KIND = 1
+    DATE_YMD_KIND = 2
+    FLOAT_KIND = 3
+
+cdef int64_t MICROSECONDS_PER_DAY = 86400 * 1000000
+
+# Powers of ten exactly representable as doubles, and the largest exact integer mantissa
+cdef double POWERS_OF_TEN[23]
+POWERS_OF_TEN[:] = [10.0 ** k for k in range(23)]
+cdef int64_t MAX_EXACT_MANTISSA = 1LL << 53
+
+# Long integers are accumulated as negative numbers, see _kernels.OVERFLOW_LIMIT
+cdef int64_t OVERFLOW_LIMIT = -922337203685477580
+cdef int64_t OVERFLOW_LAST_DIGIT = 8
+
+
+cdef inline uint64_t load8(const unsigned char *p) noexcept nogil:
+    cdef uint64_t chunk
+    memcpy(&chunk, p, 8)
+    return from_little_endian(chunk)
+
+
+cdef inline bint is_eight_digits(uint64_t chunk) noexcept nogil:
+    # Every byte is in '0'..'9' iff its high nibble is 3 and adding 6 does not carry into it
+    return ((chunk & 0xF0F0F0F0F0F0F0F0ULL)
+            | (((chunk + 0x0606060606060606ULL) & 0xF0F0F0F0F0F0F0F0ULL) >> 4)) == 0x3333333333333333ULL
+
+
+cdef inline uint64_t parse8(uint64_t chunk) noexcept nogil:
+    """Decode 8 ASCII digits loaded little-endian, folding digit pairs, then pairs of pairs."""
+    chunk = ((chunk & 0x0F0F0F0F0F0F0F0FULL) * 2561) >> 8
+    chunk = ((chunk & 0x00FF00FF00FF00FFULL) * 6553601) >> 16
+    return ((chunk & 0x0000FFFF0000FFFFULL) * 42949672960001ULL) >> 32
+
+
+cdef inline bint parse_int_field(const unsigned char *buf, Py_ssize_t lo, Py_ssize_t hi,
+                                 int64_t *value) noexcept nogil:
+    """Parse an optionally signed, blank padded ASCII integer in buf[lo:hi] into value."""
+    cdef bint negative = False
+    cdef int64_t result = 0
+    cdef unsigned char digit
+    cdef unsigned char digits[16]
+    cdef uint64_t high, low
+    cdef Py_ssize_t count
+
+    while lo < hi and (buf[lo] == SPACE or buf[lo] == TAB):
+        lo += 1
+    while hi > lo and (buf[hi - 1] == SPACE or buf[hi - 1] == TAB):
+        hi -= 1
+
+    if lo < hi and (buf[lo] == PLUS or buf[lo] == MINUS):
+        negative = buf[lo] == MINUS
+        lo += 1
+    if lo >= hi:
+        value[0] = 0
+        return False
+
+    count = hi - lo
+    if count <= 16:
+        # Right-align the digits on a run of '0's and decode them 8 at a time
+        memset(digits, ZERO, 16)
+        memcpy(digits + 16 - count, buf + lo, count)
+        low = load8(digits + 8)
+        if count <= 8:
+            if not is_eight_digits(low):
+                value[0] = 0
+                return False
+            result = parse8(low)
+        else:
+            high = load8(digits)
+            if not (is_eight_digits(high) and is_eight_digits(low)):
+                value[0] = 0
+                return False
+            result = parse8(high) * 100000000 + parse8(low)
+        value[0] = -result if negative else result
+        return True
+
+    # Longer fields may not fit, check every digit for overflow
+    while lo < hi:
+        digit = buf[lo] - ZERO
+        if digit > 9 or result < OVERFLOW_LIMIT or (result == OVERFLOW_LIMIT and digit > OVERFLOW_LAST_DIGIT):
+            value[0] = 0
+            return False
+        result = result * 10 - digit
+        lo += 1
+    if not negative:
+        if result == INT64_MIN:
+            value[0] = 0
+            return False
+        result = -result
+    value[0] = result
+    return True
+
+
+cdef inline bint is_blank(unsigned char byte) noexcept nogil:
+    return byte == SPACE or TAB <= byte <= CR
+
+
+cdef inline int64_t days_in_month(int64_t year, int64_t month) noexcept nogil:
+    if month == 2:
+        return 29 if year % 4 == 0 and (year % 100 != 0 or year % 400 == 0) else 28
+    if month == 4 or month == 6 or month == 9 or month == 11:
+        return 30
+    return 31
+
+
+cdef inline int64_t days_from_civil(int64_t year, int64_t month, int64_t day) noexcept nogil:
+    """Days since 1970-01-01 of a proleptic Gregorian date with a non-negative year."""
+    cdef int64_t era, year_of_era, day_of_year, day_of_era
+    if month <= 2:
+        year -= 1
+    era = (year if year >= 0 else year - 399) // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * (month - 3 if month > 2 else month + 9) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
+cdef inline bint parse_date_ymd_field(const unsigned char *buf, Py_ssize_t lo, Py_ssize_t hi,
+                                      int64_t *value) noexcept nogil:
+    """Parse a blank padded %Y%m%d date in buf[lo:hi] into microseconds since the epoch."""
+    cdef uint64_t chunk, digits
+    cdef int64_t year, month, day
+
+    value[0] = 0
+    while lo < hi and is_blank(buf[lo]):
+        lo += 1
+    while hi > lo and is_blank(buf[hi - 1]):
+        hi -= 1
+    if hi - lo != 8:
+        return False
+
+    # The whole date is a single SWAR word
+    chunk = load8(buf + lo)
+    if not is_eight_digits(chunk):
+        return False
+    digits = parse8(chunk)
+    year = digits // 10000
+    month = digits // 100 % 100
+    day = digits % 100
+    if month < 1 or month > 12 or day < 1 or day > days_in_month(year, month):
+        return False
+
+    value[0] = days_from_civil(year, month, day) * MICROSECONDS_PER_DAY
+    return True
+
+
+cdef inline bint is_digit(unsigned char byte) noexcept nogil:
+    return ZERO <= byte <= ZERO + 9
+
+
+cdef inline uint8_t parse_float_field(const unsigned char *buf, Py_ssize_t lo, Py_ssize_t hi,
+                                      double *value) noexcept nogil:
+    """Parse a blank padded decimal number in buf[lo:hi] into value, see flen2pq._kernels.parse_float_field."""
+    cdef bint negative = False, exponent_negative = False, exact = True
+    cdef int64_t mantissa = 0, exponent = 0, written = 0
+    cdef Py_ssize_t digits = 0
+
+    value[0] = 0.0
+    while lo < hi and is_blank(buf[lo]):
+        lo += 1
+    while hi > lo and is_blank(buf[hi - 1]):
+        hi -= 1
+
+    if lo < hi and (buf[lo] == PLUS or buf[lo] == MINUS):
+        negative = buf[lo] == MINUS
+        lo += 1
+
+    while lo < hi and is_digit(buf[lo]):
+        if mantissa < MAX_EXACT_MANTISSA:
+            mantissa = mantissa * 10 + (buf[lo] - ZERO)
+        else:
+            exact = False
+        digits += 1
+        lo += 1
+    if lo < hi and buf[lo] == DOT:
+        lo += 1
+        while lo < hi and is_digit(buf[lo]):
+            if mantissa < MAX_EXACT_MANTISSA:
+                mantissa = mantissa * 10 + (buf[lo] - ZERO)
+                exponent -= 1
+            else:
+                exact = False
+            digits += 1
+            lo += 1
+    if digits == 0:
+        # Leave inf and infinity, in any case, to the Arrow parser
+        if lo < hi and buf[lo] | 32 == LOWER_I:
+            return INEXACT
+        return NOT_A_NUMBER
+
+    if lo < hi and (buf[lo] == UPPER_E or buf[lo] == LOWER_E):
+        lo += 1
+        if lo < hi and (buf[lo] == PLUS or buf[lo] == MINUS):
+            exponent_negative = buf[lo] == MINUS
+            lo += 1
+        if lo == hi:
+            return NOT_A_NUMBER
+        while lo < hi and is_digit(buf[lo]):
+            # Anything this large is far outside the exact range anyway
+            written = min(written * 10 + (buf[lo] - ZERO), 100000)
+            lo += 1
+        exponent += -written if exponent_negative else written
+    if lo != hi:
+        return NOT_A_NUMBER
+
+    if not exact or mantissa > MAX_EXACT_MANTISSA or exponent < -22 or exponent > 22:
+        return INEXACT
+    if exponent < 0:
+        value[0] = mantissa / POWERS_OF_TEN[-exponent]
+    else:
+        value[0] = mantissa * POWERS_OF_TEN[exponent]
+    if negative:
+        value[0] = -value[0]
+    return PARSED
+
+
+cdef void parse_int_column(const unsigned char *buf, const int64_t *row_starts, const int64_t *row_ends,
+                           Py_ssize_t rows_count, Py_ssize_t start, Py_ssize_t width,
+                           int64_t *out, uint8_t *valid) noexcept nogil:
+    cdef Py_ssize_t i, lo, hi
+    for i in range(rows_count):
+        lo = row_starts[i] + start
+        hi = min(lo + width, row_ends[i])
+        valid[i] = parse_int_field(buf, lo, hi, &out[i])
+
+
+cdef void parse_monetary_column(const unsigned char *buf, const int64_t *row_starts, const int64_t *row_ends,
+                                Py_ssize_t rows_count, Py_ssize_t start, Py_ssize_t width,
+                                double *out, uint8_t *valid) noexcept nogil:
+    cdef Py_ssize_t i, lo, hi
+    cdef int64_t cents
+    # Amounts are stored in cents: the last two digits are the decimal part, see _kernels.parse_field_rows
+    for i in range(rows_count):
+        lo = row_starts[i] + start
+        hi = min(lo + width, row_ends[i])
+        valid[i] = parse_int_field(buf, lo, hi, &cents)
+        out[i] = cents / 100.0
+
+
+cdef void parse_date_ymd_column(const unsigned char *buf, const int64_t *row_starts, const int64_t *row_ends,
+                                Py_ssize_t rows_count, Py_ssize_t start, Py_ssize_t width,
+                                int64_t *out, uint8_t *valid) noexcept nogil:
+    cdef Py_ssize_t i, lo, hi
+    for i in range(rows_count):
+        lo = row_starts[i] + start
+        hi = min(lo + width, row_ends[i])
+        valid[i] = parse_date_ymd_field(buf, lo, hi, &out[i])
+
+
+cdef void parse_float_column(const unsigned char *buf, const int64_t *row_starts, const int64_t *row_ends,
+                             Py_ssize_t rows_count, Py_ssize_t start, Py_ssize_t width,
+                             double *out, uint8_t *valid) noexcept nogil:
+    cdef Py_ssize_t i, lo, hi
+    for i in range(rows_count):
+        lo = row_starts[i] + start
+        hi = min(lo + width, row_ends[i])
+        valid[i] = parse_float_field(buf, lo, hi, &out[i])
+
+
+def parse_fields(const unsigned char[::1] buf, const int64_t[::1] row_starts, const int64_t[::1] row_ends,
+                 const int8_t[::1] kinds, const int64_t[::1] starts, const int64_t[::1] widths, const int64_t[::1] slots,
+                 int64_t[:, ::1] ints, double[:, ::1] floats, uint8_t[:, ::1] valid):
+    """Decode the fields of a row layout one column after the other, see _kernels.parse_fields."""
+    cdef Py_ssize_t n, rows_count = row_starts.shape[0]
+    if rows_count <= 0:
+        return
+    with nogil:
+        for n in range(kinds.shape[0]):
+            if kinds[n] == INT_KIND:
+                parse_int_column(&buf[0], &row_starts[0], &row_ends[0], rows_count, starts[n], widths[n],
+                                 &ints[slots[n], 0], &valid[n, 0])
+            elif kinds[n] == MONETARY_KIND:
+                parse_monetary_column(&buf[0], &row_starts[0], &row_ends[0], rows_count, starts[n], widths[n],
+                                      &floats[slots[n], 0], &valid[n, 0])
+            elif kinds[n] == DATE_YMD_KIND:
+                parse_date_ymd_column(&buf[0], &row_starts[0], &row_ends[0], rows_count, starts[n], widths[n],
+                                      &ints[slots[n], 0], &valid[n, 0])
+            else:
+                parse_float_column(&buf[0], &row_starts[0], &row_ends[0], rows_count, starts[n], widths[n],
+                                   &floats[slots[n], 0], &valid[n, 0])
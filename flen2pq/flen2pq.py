@@ -1,99 +1,493 @@
+import mmap
 import os
+import queue
+import re
+import threading
 
-import pandas as pd
+import numpy as np
 import pyarrow as pa
+import pyarrow.compute as pc
 import pyarrow.parquet as pq
 import yaml
 import argparse
 import sys
 
-from pandas.errors import ParserError
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
+from flen2pq import _kernels
 
-class TypeHandlers:
+# The libyaml based loader is much faster on large descriptors, when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 
-    @staticmethod
-    def monetary_type_handler(str_amount: str) -> float:
-        integer_part = str_amount[:-2]
-        decimal_part = str_amount[-2:]
-        return float(integer_part + '.' + decimal_part)
 
-    @staticmethod
-    def int_type_handler(str_int: str) -> int:
-        return int(str_int.strip())
+# Accepts the same literals pd.to_numeric does for decimal numbers and infinities. NaN is left
+# out, pandas stored it as null like any other value that is not a number
+FLOAT_PATTERN = r'^[+-]?((\d+\.?\d*|\.\d+)([eE][+-]?\d+)?|(?i:inf|infinity))$'
+
+# Sign of an integer, which int() accepts but the Arrow cast does not
+LEADING_PLUS = r'^\+(\d)'
+
+# Leading zeros of the numbers in a date, which strptime accepts but does not require
+DATE_LEADING_ZEROS = r'(^|\D)0+(\d)'
+
+# Directives of strftime formats, and the ones pc.strptime cannot parse (%f) or that give a
+# timestamp with a time zone (%z, %Z), which does not fit the timestamp('us') date columns
+DATE_DIRECTIVE = r'%.'
+UNSUPPORTED_DATE_DIRECTIVES = {'%f', '%z', '%Z'}
+
+# Integer codes of the column types, so the per-chunk driver does not compare type names
+INT, FLOAT, BOOL, DATE, FIXED_MONETARY, STRING = range(6)
+TYPE_CODES = {
+    'int': INT,
+    'float': FLOAT,
+    'bool': BOOL,
+    'date': DATE,
+    'fixed_monetary': FIXED_MONETARY,
+}
+
+# Kind of _kernels.parse_fields field of the column types it decodes straight from the row bytes
+KERNEL_KINDS = {
+    INT: 'int',
+    FLOAT: 'float',
+    BOOL: 'bool',
+    FIXED_MONETARY: 'fixed_monetary',
+}
+
+# Output dtype of the field kinds _kernels.parse_fields decodes straight from the row bytes
+KERNEL_DTYPES = {
+    'int': np.int64,
+    'fixed_monetary': np.float64,
+    'date_ymd': np.int64,
+    'float': np.float64,
+    'bool': np.float64,
+}
+
+# Date formats decoded by _kernels.parse_fields instead of pc.strptime
+DATE_KERNELS = {
+    '%Y%m%d': 'date_ymd',
+}
+
+# Arrow type of each column type, any other type is kept as a string
+ARROW_TYPES = {
+    'int': pa.int64(),
+    'float': pa.float64(),
+    'bool': pa.bool_(),
+    'date': pa.timestamp('us'),
+    'fixed_monetary': pa.float64(),
+}
+
+# Parsed chunks are buffered and written together, so a row group spans several chunks
+BATCHES_PER_ROW_GROUP = 16
+
+# Default chunks are sized so that one parsed batch stays resident in a 256 KiB L2 cache
+L2_CACHE_BYTES = 256 * 1024
+MIN_CHUNK_SIZE = 1024
+
+# The output is written next to its final path and renamed over it once complete
+PART_SUFFIX = '.part'
+
+# Row groups waiting for the writer thread, bounding the memory held by parsed chunks
+WRITE_QUEUE_SIZE = 4
+
+# Compression and dictionary encoding are configurable, see FixedWidthToParquetConverter
+PARQUET_WRITER_OPTIONS = {
+    'write_batch_size': 8192,
+    'data_page_size': 1 << 20,
+    'write_statistics': True,
+}
+DEFAULT_COMPRESSION = 'zstd'
+ZSTD_COMPRESSION_LEVEL = 3
+
+
+class ParserError(ValueError):
+    """Raised when a block of the input file cannot be split into rows."""
+
+
+def arrow_type(field):
+    return ARROW_TYPES.get(field['type'], pa.large_string())
+
+
+def kernel_kind(type_code, col_format):
+    """Kind of _kernels.parse_fields field decoding a field, or None when Arrow compute converts it."""
+    if type_code == DATE:
+        return DATE_KERNELS.get(col_format)
+    return KERNEL_KINDS.get(type_code)
+
+
+def check_date_format(name, col_format):
+    unsupported = set(re.findall(DATE_DIRECTIVE, col_format)) & UNSUPPORTED_DATE_DIRECTIVES
+    if unsupported:
+        raise ValueError(f"Date format {col_format!r} of column {name} uses the unsupported "
+                         f"directives {', '.join(sorted(unsupported))}")
+
+
+def normalize_date_text(column):
+    return pc.replace_substring_regex(pc.utf8_lower(column), DATE_LEADING_ZEROS, r'\1\2')
 
 
 class FixedWidthToParquetConverter:
-    def __init__(self, input_file, output_file, fields, chunk_size=10000, fault_tolerant = True):
+    def __init__(self, input_file, output_file, fields, chunk_size=None, fault_tolerant = True,
+                 compression=DEFAULT_COMPRESSION, compression_level=None, use_dictionary=True):
         self.input_file = input_file
         self.output_file = output_file
         self.fields = fields
+        # The schema is fixed by the fields, so it is built once instead of inferred for every chunk
+        self.schema = pa.schema([(field['name'], arrow_type(field)) for field in fields])
+        # Field layout as parallel arrays, walked by the per-chunk driver instead of the field dicts
+        self.names = [field['name'] for field in fields]
+        self.widths = np.array([field['length'] for field in fields], dtype=np.int64)
+        self.offsets = np.cumsum(self.widths) - self.widths
+        self.type_codes = np.array([TYPE_CODES.get(field['type'], STRING) for field in fields], dtype=np.int8)
+        self.formats = [field.get('format') for field in fields]
+        self.row_width = int(self.widths.sum())
+        # Fail before reading the input on date formats that cannot be converted
+        for name, type_code, col_format in zip(self.names, self.type_codes, self.formats):
+            if type_code == DATE and col_format:
+                check_date_format(name, col_format)
+
+        # Fields decoded from the raw bytes by _kernels.parse_fields, and the ones left to Arrow
+        kinds = [kernel_kind(type_code, col_format) for type_code, col_format in zip(self.type_codes, self.formats)]
+        self.kernel_indices = [index for index, kind in enumerate(kinds) if kind]
+        self.kernel_kinds = [kinds[index] for index in self.kernel_indices]
+        self.arrow_indices = [index for index, kind in enumerate(kinds) if not kind]
+        # Layout of the kernel fields as parallel arrays, each field decoded into a row of the
+        # int64 or the float64 output of its chunk
+        self.kernel_codes = np.array([_kernels.KIND_CODES[kind] for kind in self.kernel_kinds], dtype=np.int8)
+        self.kernel_offsets = self.offsets[self.kernel_indices]
+        self.kernel_widths = self.widths[self.kernel_indices]
+        self.kernel_int = np.array([KERNEL_DTYPES[kind] == np.int64 for kind in self.kernel_kinds], dtype=bool)
+        self.kernel_slots = np.where(self.kernel_int, np.cumsum(self.kernel_int), np.cumsum(~self.kernel_int)) - 1
+        self.int_outputs = int(self.kernel_int.sum())
+        self.float_outputs = len(self.kernel_int) - self.int_outputs
+
+        # Unless overridden, derive the number of rows per chunk from the row width
+        if chunk_size is None:
+            chunk_size = max(MIN_CHUNK_SIZE, L2_CACHE_BYTES // max(self.row_width, 1))
         self.chunk_size = chunk_size
         self.fault_tolerant = fault_tolerant
+        self.compression = compression
+        # Unless overridden, zstd uses a level giving smaller files than the library default
+        if compression_level is None and compression == 'zstd':
+            compression_level = ZSTD_COMPRESSION_LEVEL
+        self.compression_level = compression_level
+        self.use_dictionary = use_dictionary
 
-    def convert(self):
-        # Extract column names and widths
-        column_names = [field['name'] for field in self.fields]
-        column_widths = [field['length'] for field in self.fields]
+    def read_rows(self):
+        """Yield the input file in blocks of whole rows, about chunk_size rows each.
 
-        # Initialize the Parquet file
-        first_chunk = True
-        pq_writer = None
-        in_error = False
-        # Read the file in chunks
+        The blocks are uint8 arrays viewing the memory map of the file, split into rows by
+        split_rows without being copied.
+        """
+        # One extra byte per row for the newline
+        window = self.chunk_size * (self.row_width + 1)
+
+        with open(self.input_file, 'rb') as file:
+            size = os.fstat(file.fileno()).st_size
+            # Empty files cannot be mapped
+            if size == 0:
+                return
+            mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if hasattr(mmap, 'MADV_SEQUENTIAL'):
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+        # The file is unmapped once the last block viewing it is released, so it is never closed
+        # while chunks are still being parsed, or under the buffers of a pending exception
+        data = np.frombuffer(mm, dtype=np.uint8)
+
+        start = 0
+        while start < size:
+            end = min(start + window, size)
+            if end < size:
+                # End the window after its last complete row, or after the
+                # first one when a single row is longer than the window
+                newline = mm.rfind(b'\n', start, end)
+                if newline == -1:
+                    newline = mm.find(b'\n', end)
+                end = size if newline == -1 else newline + 1
+
+            yield data[start:end]
+            start = end
+
+    @staticmethod
+    def split_rows(block):
+        """Find the rows of a block in place, in a single pass over its bytes.
+
+        Return the start and end of each row, without its line break, and whether the block is
+        all ASCII. Blank lines are skipped, including the ones made only of whitespace as
+        read_fwf did.
+        """
+        lines = _kernels.count_lines(block)
+        row_starts = np.empty(lines, dtype=np.int64)
+        row_ends = np.empty(lines, dtype=np.int64)
+        rows_count, ascii = _kernels.find_rows(block, row_starts, row_ends)
+        return row_starts[:rows_count], row_ends[:rows_count], ascii
+
+    @staticmethod
+    def decode_rows(block, row_starts, row_ends):
+        """Copy the rows of a block with non-ASCII bytes into an Arrow string array, checking their encoding."""
+        rows = FixedWidthToParquetConverter.gather_strings(block, row_starts, row_ends - row_starts)
+        try:
+            rows.validate(full=True)
+        except pa.ArrowInvalid:
+            # Fail with the error of the Python decoder, as read_fwf did, which locates the bytes
+            bytes(block).decode('utf-8')
+            raise
+        return rows
 
-        with pd.read_fwf(self.input_file, widths=column_widths, names=column_names, chunksize=self.chunk_size,
-                         dtype=str,
-                         keep_default_na=False) as file:
+    def parse_rows(self, block):
+        """Slice every field out of the rows of a block and convert it to its Arrow type.
+
+        Return None when the block is made only of blank lines.
+        """
+        row_starts, row_ends, ascii = self.split_rows(block)
+        if len(row_starts) == 0:
+            return None
+
+        # Byte and character positions only agree on ASCII rows
+        if ascii:
+            columns = self.parse_kernel_fields(block, row_starts, row_ends)
+            indices = self.arrow_indices
+        else:
+            rows = self.decode_rows(block, row_starts, row_ends)
+            columns = [None] * len(self.names)
+            indices = range(len(self.names))
+
+        for index in indices:
+            start = int(self.offsets[index])
+            width = int(self.widths[index])
+            if ascii:
+                column = self.slice_field(block, row_starts, row_ends, start, width)
+            else:
+                column = pc.utf8_trim_whitespace(pc.utf8_slice_codeunits(rows, start, start + width))
+            columns[index] = self.convert_field(column, index)
+
+        return pa.RecordBatch.from_arrays(columns, schema=self.schema)
+
+    @staticmethod
+    def slice_field(buf, row_starts, row_ends, start, width):
+        """Cut a trimmed field out of ASCII rows into an Arrow string array."""
+        rows_count = len(row_starts)
+        field_starts = np.empty(rows_count, dtype=np.int64)
+        field_lengths = np.empty(rows_count, dtype=np.int64)
+        _kernels.trim_fields(buf, row_starts, row_ends, start, width, field_starts, field_lengths)
+        return FixedWidthToParquetConverter.gather_strings(buf, field_starts, field_lengths)
+
+    @staticmethod
+    def gather_strings(buf, starts, lengths):
+        # Build the Arrow string buffers of the byte ranges directly
+        value_offsets = np.zeros(len(starts) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=value_offsets[1:])
+        data = np.empty(value_offsets[-1], dtype=np.uint8)
+        _kernels.gather_fields(buf, starts, value_offsets, data)
+        return pa.Array.from_buffers(pa.large_string(), len(starts),
+                                     [None, pa.py_buffer(value_offsets), pa.py_buffer(data)])
+
+    def convert_field(self, column, index):
+        type_code = self.type_codes[index]
+        if type_code == INT:
+            column = self.to_int(column)
+        elif type_code == FLOAT:
+            column = self.to_float(column)
+        elif type_code == BOOL:
+            # Unparsable values are truthy, as NaN was with the pandas conversion
+            column = pc.fill_null(pc.not_equal(self.to_float(column), 0), True)
+        elif type_code == DATE:
+            col_format = self.formats[index]
+            if not col_format:
+                raise ValueError(f"Column format not specified for date column {self.names[index]}")
+            column = self.to_date(column, col_format)
+        elif type_code == FIXED_MONETARY:
+            # The last two digits are the decimal part: parse the amount in cents and scale it
+            column = pc.divide(self.to_int(column), 100.0)
+        return column
+
+    def parse_kernel_fields(self, buf, row_starts, row_ends):
+        """Decode all the kernel fields of ASCII rows in one call to _kernels.parse_fields.
+
+        Return the columns of all the fields by position, None for the fields left to Arrow.
+        """
+        columns = [None] * len(self.names)
+        if not self.kernel_indices:
+            return columns
+
+        rows_count = len(row_starts)
+        ints = np.empty((self.int_outputs, rows_count), dtype=np.int64)
+        floats = np.empty((self.float_outputs, rows_count), dtype=np.float64)
+        valid = np.empty((len(self.kernel_indices), rows_count), dtype=np.uint8)
+        _kernels.parse_fields(buf, row_starts, row_ends, self.kernel_codes, self.kernel_offsets, self.kernel_widths,
+                              self.kernel_slots, ints, floats, valid)
+
+        for n, (index, kind, slot) in enumerate(zip(self.kernel_indices, self.kernel_kinds, self.kernel_slots)):
+            out = ints[slot] if self.kernel_int[n] else floats[slot]
+            columns[index] = self.kernel_column(buf, row_starts, row_ends, index, kind, out, valid[n])
+        return columns
+
+    def kernel_column(self, buf, row_starts, row_ends, index, kind, out, valid):
+        """Wrap the arrays filled by parse_fields for a field into an Arrow array."""
+        if kind in ('float', 'bool') and (valid == _kernels.INEXACT).any():
+            # Leave numbers outside the exact fast path to the Arrow parser
+            column = self.slice_field(buf, row_starts, row_ends, int(self.offsets[index]), int(self.widths[index]))
+            return self.convert_field(column, index)
+        if kind == 'float':
+            return pa.array(out, mask=valid == 0)
+        if kind == 'bool':
+            # Unparsable values are truthy, as NaN was with the pandas conversion
+            return pa.array((valid == 0) | (out != 0))
+        if kind == 'date_ymd':
+            # Invalid dates become null, as in to_date
+            return pa.array(out, type=pa.timestamp('us'), mask=valid == 0)
+
+        if not valid.all():
+            row = int(np.argmin(valid))
+            raise ValueError(f"Invalid {kind} value in column {self.names[index]} at row {row} of the chunk")
+        return pa.array(out)
+
+    @staticmethod
+    def to_int(column):
+        # Accept a leading + like the kernels do, the cast rejects it
+        return pc.cast(pc.replace_substring_regex(column, LEADING_PLUS, r'\1'), pa.int64())
+
+    @staticmethod
+    def to_float(column):
+        # Values that are not numbers become null instead of failing the cast
+        numeric = pc.match_substring_regex(column, FLOAT_PATTERN)
+        return pc.cast(pc.if_else(numeric, column, None), pa.float64())
+
+    @staticmethod
+    def to_date(column, col_format):
+        parsed = pc.strptime(column, format=col_format, unit='us', error_is_null=True)
+        # strptime rolls impossible dates over (31/02 becomes 03/03), so the values that do not
+        # format back to their text become null, as with pd.to_datetime(errors='coerce'). The
+        # comparison ignores the case and leading zeros, which strptime does not require
+        text = pc.strftime(pc.cast(parsed, pa.timestamp('s')), format=col_format)
+        rolled_over = pc.not_equal(normalize_date_text(text), normalize_date_text(column))
+        return pc.if_else(rolled_over, None, parsed)
+
+    def read_batches(self):
+        """Yield the input file as Arrow record batches, one per chunk, in file order."""
+        # The kernels and Arrow compute functions release the GIL, so threads parse chunks in parallel
+        workers = os.cpu_count() or 1
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            parsing = deque()
             try:
-                for chunk in file:
-                    # If the chunk is empty, we have finished reading
-                    if chunk.empty:
-                        break
-
-                    # Convert data types
-                    for field in self.fields:
-                        col_name = field['name']
-                        col_type = field['type']
-                        if col_type == 'int':
-                            chunk[col_name] = chunk[col_name].apply(TypeHandlers.int_type_handler)
-                        elif col_type == 'float':
-                            chunk[col_name] = pd.to_numeric(chunk[col_name], errors='coerce')
-                        elif col_type == 'bool':
-                            chunk[col_name] = pd.to_numeric(chunk[col_name], errors='coerce').astype(bool)
-                        elif col_type == 'date':
-                            col_format = field.get('format')
-                            if not col_format:
-                                raise ValueError(f"Column format not specified for date column {col_name}")
-                            chunk[col_name] = pd.to_datetime(chunk[col_name], format=col_format, errors='coerce')
-                        elif col_type == 'fixed_monetary':
-                            chunk[col_name] = chunk[col_name].apply(TypeHandlers.monetary_type_handler)
-
-                    # Convert the chunk to an Arrow table
-                    table = pa.Table.from_pandas(chunk)
-
-                    # Write the chunk to the Parquet file (append if not the first chunk)
-                    if first_chunk:
-                        pq_writer = pq.ParquetWriter(self.output_file, table.schema)
-                        first_chunk = False
-
-                    pq_writer.write_table(table)
+                for block in self.read_rows():
+                    parsing.append(executor.submit(self.parse_rows, block))
+                    # Bound the number of chunks held in memory
+                    if len(parsing) > 2 * workers:
+                        batch = parsing.popleft().result()
+                        # Skip blocks made only of blank lines
+                        if batch is not None:
+                            yield batch
             except ParserError as pe:
                 print(pe)
                 if self.fault_tolerant is False:
                     raise pe
+
+            while parsing:
+                batch = parsing.popleft().result()
+                if batch is not None:
+                    yield batch
+
+    def writer_options(self):
+        options = dict(PARQUET_WRITER_OPTIONS, compression=self.compression, use_dictionary=self.use_dictionary)
+        if self.compression_level is not None:
+            options['compression_level'] = self.compression_level
+        return options
+
+    @staticmethod
+    def write_row_groups(pq_writer, row_groups, errors):
+        """Write the tables taken from the row_groups queue until None is received."""
+        while True:
+            table = row_groups.get()
+            if table is None:
+                break
+            # After a failure keep draining the queue, so that the producer never blocks
+            if errors:
+                continue
+            try:
+                pq_writer.write_table(table, row_group_size=table.num_rows)
             except Exception as e:
-                in_error = True
-                print(e)
+                errors.append(e)
+
+    def convert(self):
+        # Initialize the Parquet file
+        first_chunk = True
+        pq_writer = None
+        in_error = False
+        parser_error = None
+        part_file = self.output_file + PART_SUFFIX
+        row_group_size = self.chunk_size * BATCHES_PER_ROW_GROUP
+        pending = []
+        pending_rows = 0
+
+        # Row groups are compressed and written on a background thread while the next chunks are parsed
+        row_groups = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        write_errors = []
+        writer_thread = None
+
+        # Read the file in chunks
+        try:
+            for batch in self.read_batches():
+                # Open the Parquet file on the first chunk
+                if first_chunk:
+                    pq_writer = pq.ParquetWriter(part_file, self.schema, **self.writer_options())
+                    writer_thread = threading.Thread(target=self.write_row_groups,
+                                                     args=(pq_writer, row_groups, write_errors), daemon=True)
+                    writer_thread.start()
+                    first_chunk = False
+
+                pending.append(batch)
+                pending_rows += batch.num_rows
+                while pending_rows >= row_group_size:
+                    # Queue only whole row groups and keep the remainder for the next one
+                    table = pa.Table.from_batches(pending)
+                    row_groups.put(table.slice(0, row_group_size))
+                    pending = table.slice(row_group_size).to_batches()
+                    pending_rows -= row_group_size
+                if write_errors:
+                    raise write_errors[0]
+
+            if pending:
+                row_groups.put(pa.Table.from_batches(pending))
+        except ParserError as pe:
+            # Only raised when not fault tolerant, propagated once the partial output is discarded
+            parser_error = pe
+        except Exception as e:
+            in_error = True
+            print(e)
+        finally:
+            if writer_thread:
+                row_groups.put(None)
+                writer_thread.join()
+            # Finalize and close the Parquet writer, writing the footer can fail as well
+            if pq_writer:
+                try:
+                    pq_writer.close()
+                except Exception as e:
+                    write_errors.append(e)
 
-        # Finalize and close the Parquet writer
-        if pq_writer:
-            pq_writer.close()
+        if write_errors and not in_error:
+            in_error = True
+            print(write_errors[0])
+
+        if in_error or parser_error:
+            try:
+                os.unlink(part_file)
+            except FileNotFoundError:
+                pass
+        if parser_error:
+            raise parser_error
         if in_error:
-            os.remove(self.output_file)
             print(f"Something went wrong during the Parquet conversion. Please check the input file and try again.")
             sys.exit(1)
         else:
+            # Publish the complete file in a single step
+            if pq_writer:
+                os.replace(part_file, self.output_file)
             print(f"Conversion complete: Parquet file saved as '{self.output_file}'")
 
 
@@ -101,13 +495,17 @@ class ConfigLoader:
     @staticmethod
     def from_yaml(config_file):
         with open(config_file, 'r') as file:
-            config = yaml.safe_load(file)
+            config = yaml.load(file, Loader=SafeLoader)
             input_file = config['input']
             output_file = config['output']
             fault_tolerant = config['fault_tolerant']
             fields = config['fields']
-            chunk_size = config.get('chunk_size', 10000)
-            return input_file, output_file, fields, chunk_size, fault_tolerant
+            chunk_size = config.get('chunk_size')
+            compression = config.get('compression', DEFAULT_COMPRESSION)
+            compression_level = config.get('compression_level')
+            use_dictionary = config.get('use_dictionary', True)
+            return (input_file, output_file, fields, chunk_size, fault_tolerant,
+                    compression, compression_level, use_dictionary)
 
     @staticmethod
     def from_args(args):
@@ -120,7 +518,11 @@ class ConfigLoader:
         fields = [{'name': name, 'length': length, 'type': dtype}
                   for name, length, dtype in zip(column_names, column_widths, column_types)]
         chunk_size = args.chunk_size
-        return input_file, output_file, fields, chunk_size, fault_tolerant
+        compression = args.compression
+        compression_level = args.compression_level
+        use_dictionary = args.use_dictionary
+        return (input_file, output_file, fields, chunk_size, fault_tolerant,
+                compression, compression_level, use_dictionary)
 
 
 def parse_args():
@@ -133,8 +535,14 @@ def parse_args():
     parser.add_argument('--column_widths', type=str, help='Comma-separated column widths.')
     parser.add_argument("--fault-tolerant", type=bool, help='Fault tolerant processing')
     parser.add_argument('--column_types', type=str, help='Comma-separated column types (int, float, string).')
-    parser.add_argument('--chunk_size', type=int, default=10000,
-                        help='Number of rows per chunk (default: 10000).')
+    parser.add_argument('--chunk_size', type=int,
+                        help='Number of rows per chunk (default: as many rows as fit in 256 KiB).')
+    parser.add_argument('--compression', type=str, default=DEFAULT_COMPRESSION,
+                        help=f'Parquet compression codec (default: {DEFAULT_COMPRESSION}).')
+    parser.add_argument('--compression_level', type=int,
+                        help=f'Compression level (default: {ZSTD_COMPRESSION_LEVEL} for zstd, codec default otherwise).')
+    parser.add_argument('--use_dictionary', action=argparse.BooleanOptionalAction, default=True,
+                        help='Dictionary encode the columns (default: enabled).')
 
     # YAML file parameter
     parser.add_argument('--config_file', type=str, help='Path to the YAML configuration file.')
@@ -146,16 +554,19 @@ def main():
 
     if args.config_file:
         # Load parameters from the YAML file
-        input_file, output_file, fields, chunk_size, fault_tolerant = ConfigLoader.from_yaml(args.config_file)
+        (input_file, output_file, fields, chunk_size, fault_tolerant,
+         compression, compression_level, use_dictionary) = ConfigLoader.from_yaml(args.config_file)
     elif args.input_file and args.output_file and args.column_names and args.column_widths and args.column_types:
         # Load parameters from command-line arguments
-        input_file, output_file, fields, chunk_size, fault_tolerant = ConfigLoader.from_args(args)
+        (input_file, output_file, fields, chunk_size, fault_tolerant,
+         compression, compression_level, use_dictionary) = ConfigLoader.from_args(args)
     else:
         print("Error: Please specify either the YAML file or all required parameters.")
         sys.exit(1)
 
     # Create the converter object and start the conversion
-    converter = FixedWidthToParquetConverter(input_file, output_file, fields, chunk_size, fault_tolerant)
+    converter = FixedWidthToParquetConverter(input_file, output_file, fields, chunk_size, fault_tolerant,
+                                             compression, compression_level, use_dictionary)
     converter.convert()
 
 if __name__ == '__main__':
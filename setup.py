@@ -1,12 +1,14 @@
 import numpy
-from setuptools import setup
+from setuptools import Extension, setup
 from Cython.Build import cythonize
 
 setup(
     name='flen2pq',
     version='1.0.0',
     py_modules=['flen2pq'],
-    ext_modules=cythonize('flen2pq/flen2pq.py', compiler_directives={"language_level": "3"}, annotate=True
+    ext_modules=cythonize(['flen2pq/flen2pq.py',
+                           Extension('flen2pq._parse', ['flen2pq/_parse.pyx'])],
+                          compiler_directives={"language_level": "3"}, annotate=True
                           ),
 
     zip_safe=False,
@@ -1,11 +1,22 @@
 import os
+import sys
 import tempfile
+import threading
+import time
 import unittest
+from unittest import mock
 
 import pandas as pd
 import pyarrow.parquet as pq
 
-from flen2pq.flen2pq import FixedWidthToParquetConverter
+from flen2pq import _kernels
+from flen2pq.flen2pq import (BATCHES_PER_ROW_GROUP, L2_CACHE_BYTES, MIN_CHUNK_SIZE, WRITE_QUEUE_SIZE,
+                             ZSTD_COMPRESSION_LEVEL, ConfigLoader, FixedWidthToParquetConverter, main)
+
+try:
+    from flen2pq import _parse
+except ImportError:
+    _parse = None
 
 
 class TestFixedWidthToParquetConverter(unittest.TestCase):
@@ -13,11 +24,18 @@ class TestFixedWidthToParquetConverter(unittest.TestCase):
     def setUp(self):
         # Create a temporary directory for test files
         self.test_dir = tempfile.TemporaryDirectory()
+        # Decode the kernel fields with the Numba row parser, whether the extension is built or not
+        self.use_backend(None)
 
     def tearDown(self):
         # Clean up the temporary directory
         self.test_dir.cleanup()
 
+    def use_backend(self, module):
+        patcher = mock.patch.object(_kernels, '_parse', module)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     def test_convert_basic(self):
         input_data = ["1234567890123456", "7890123456789012"]
         expected_data = pd.DataFrame({
@@ -47,6 +65,119 @@ class TestFixedWidthToParquetConverter(unittest.TestCase):
         result_data = pd.read_parquet(output_file_path)
         pd.testing.assert_frame_equal(result_data, expected_data)
 
+    def test_skip_blank_lines(self):
+        input_data = ["123456", "", "    ", "\t", "789012", "345678\r", " \r", "\r"]
+        expected_data = pd.DataFrame({
+            'col1': [123456, 789012, 345678]
+        })
+
+        input_file_path = os.path.join(self.test_dir.name, 'input.txt')
+        output_file_path = os.path.join(self.test_dir.name, 'output.parquet')
+
+        with open(input_file_path, 'w') as f:
+            for item in input_data:
+                f.write("%s\n" % item)
+
+        fields = [
+            {'name': 'col1', 'length': 6, 'type': 'int'},
+        ]
+
+        converter = FixedWidthToParquetConverter(input_file_path, output_file_path, fields)
+        converter.convert()
+
+        result_data = pd.read_parquet(output_file_path)
+        pd.testing.assert_frame_equal(result_data, expected_data)
+
+    def test_convert_int_range(self):
+        input_data = [" 9223372036854775807", "-9223372036854775808", "00000000000000000042"]
+        expected_data = pd.DataFrame({
+            'col1': [2 ** 63 - 1, -2 ** 63, 42]
+        })
+
+        input_file_path = os.path.join(self.test_dir.name, 'input.txt')
+        output_file_path = os.path.join(self.test_dir.name, 'output.parquet')
+
+        with open(input_file_path, 'w') as f:
+            for item in input_data:
+                f.write("%s\n" % item)
+
+        fields = [
+            {'name': 'col1', 'length': 20, 'type': 'int'},
+        ]
+
+        converter = FixedWidthToParquetConverter(input_file_path, output_file_path, fields)
+        converter.convert()
+
+        result_data = pd.read_parquet(output_file_path)
+        pd.testing.assert_frame_equal(result_data, expected_data)
+        os.remove(output_file_path)
+
+        # Values out of the int64 range fail the conversion instead of wrapping around
+        for value in [" 9223372036854775808", "-9223372036854775809", "99999999999999999999"]:
+            with open(input_file_path, 'w') as f:
+                f.write("%s\n" % value)
+
+            with self.assertRaises(SystemExit):
+                converter.convert()
+            self.assertFalse(os.path.exists(output_file_path))
+
+    def test_default_chunk_size(self):
+        input_file_path = os.path.join(self.test_dir.name, 'input.txt')
+        output_file_path = os.path.join(self.test_dir.name, 'output.parquet')
+
+        narrow_fields = [
+            {'name': 'col1', 'length': 6, 'type': 'int'},
+            {'name': 'col2', 'length': 10, 'type': 'string'},
+        ]
+        wide_fields = [
+            {'name': 'col1', 'length': 6, 'type': 'int'},
+            {'name': 'col2', 'length': 4000, 'type': 'string'},
+        ]
+
+        # As many rows as fit in the L2 cache, but never fewer than MIN_CHUNK_SIZE
+        converter = FixedWidthToParquetConverter(input_file_path, output_file_path, narrow_fields)
+        self.assertEqual(converter.chunk_size, L2_CACHE_BYTES // 16)
+        converter = FixedWidthToParquetConverter(input_file_path, output_file_path, wide_fields)
+        self.assertEqual(converter.chunk_size, MIN_CHUNK_SIZE)
+
+        # An explicit chunk size is kept as is
+        converter = FixedWidthToParquetConverter(input_file_path, output_file_path, wide_fields, chunk_size=10)
+        self.assertEqual(converter.chunk_size, 10)
+
+    def test_convert_multiple_chunks(self):
+        chunk_size = 4
+        row_group_size = chunk_size * BATCHES_PER_ROW_GROUP
+        rows_count = 2 * row_group_size + 22
+        expected_data = pd.DataFrame({
+            'col1': list(range(rows_count)),
+            'col2': [f'r{row}' for row in range(rows_count)]
+        })
+
+        input_file_path = os.path.join(self.test_dir.name, 'input.txt')
+        output_file_path = os.path.join(self.test_dir.name, 'output.parquet')
+
+        with open(input_file_path, 'w') as f:
+            for row in range(rows_count):
+                f.write("%6d%-4s\n" % (row, f'r{row}'))
+
+        fields = [
+            {'name': 'col1', 'length': 6, 'type': 'int'},
+            {'name': 'col2', 'length': 4, 'type': 'string'},
+        ]
+
+        converter = FixedWidthToParquetConverter(input_file_path, output_file_path, fields, chunk_size=chunk_size)
+        converter.convert()
+
+        # Chunks are merged into whole row groups, with the remaining rows in the last one
+        metadata = pq.ParquetFile(output_file_path).metadata
+        self.assertEqual(metadata.num_row_groups, 3)
+        self.assertEqual([metadata.row_group(index).num_rows for index in range(metadata.num_row_groups)],
+                         [row_group_size, row_group_size, 22])
+
+        # Rows keep the order of the file
+        result_data = pd.read_parquet(output_file_path)
+        pd.testing.assert_frame_equal(result_data, expected_data)
+
     def test_convert_monetary_type(self):
         input_data = ["123450123456", "678900789012"]
         expected_data = pd.DataFrame({
@@ -78,6 +209,264 @@ class TestFixedWidthToParquetConverter(unittest.TestCase):
 
         pd.testing.assert_frame_equal(result_data, expected_data)
 
+    def test_convert_padded_values(self):
+        input_data = ["   -42 12345", "     7-01000"]
+        expected_data = pd.DataFrame({
+            'col1': [-42, 7],
+            'col2': [123.45, -10.0]
+        })
+
+        input_file_path = os.path.join(self.test_dir.name, 'input.txt')
+        output_file_path = os.path.join(self.test_dir.name, 'output.parquet')
+
+        with open(input_file_path, 'w') as f:
+            for item in input_data:
+                f.write("%s\n" % item)
+
+        fields = [
+            {'name': 'col1', 'length': 6, 'type': 'int'},
+            {'name': 'col2', 'length': 6, 'type': 'fixed_monetary'},
+        ]
+
+        converter = FixedWidthToParquetConverter(input_file_path, output_file_path, fields)
+        converter.convert()
+
+        # Read the Parquet file and compare with the expected data
+        result_data = pd.read_parquet(output_file_path)
+        pd.testing.assert_frame_equal(result_data, expected_data)
+
+    def test_convert_float_type(self):
+        # The first chunk is decoded by the row parser, the second one has values outside its exact
+        # range: past 2**53, past 1e22, or with too many significant digits
+        chunks = [
+            ["1e3", "-2.5E-2", ".5", "5.", "+7", "0.1e-3", "1.5e22", "9007199254740992"],
+            ["9007199254740993", "1e23", "1.7976931348623157e308", "123456789012345678901234", "0.1e-30"],
+        ]
+        invalid_data = ["abc", "1e", ".", "+", "1.2.3", "1 5"]
+
+        input_file_path = os.path.join(self.test_dir.name, 'input.txt')
+        output_file_path = os.path.join(self.test_dir.name, 'output.parquet')
+
+        fields = [
+            {'name': 'col1', 'length': 24, 'type': 'float'},
+        ]
+
+        for values in chunks:
+            with open(input_file_path, 'w') as f:
+                for item in values + invalid_data:
+                    f.write("%24s\n" % item)
+
+            converter = FixedWidthToParquetConverter(input_file_path, output_file_path, fields)
+            converter.convert()
+
+            # Numbers are correctly rounded and anything else becomes null
+            expected_data = pd.DataFrame({
+                'col1': [float(item) for item in values] + [None] * len(invalid_data)
+            })
+            result_data = pd.read_parquet(output_file_path)
+            pd.testing.assert_frame_equal(result_data, expected_data)
+
+    def test_convert_bool_type(self):
+        input_data = ["   1", "   0", " 0.0", "  -0", " 2.5", " abc", "  1e", "1e30", " inf", " nan"]
+        expected_data = pd.DataFrame({
+            'col1': [True, False, False, False, True, True, True, True, True, True]
+        })
+
+        input_file_path = os.path.join(self.test_dir.name, 'input.txt')
+        output_file_path = os.path.join(self.test_dir.name, 'output.parquet')
+
+        with open(input_file_path, 'w') as f:
+            for item in input_data:
+                f.write("%s\n" % item)
+
+        fields = [
+            {'name': 'col1', 'length': 4, 'type': 'bool'},
+        ]
+
+        converter = FixedWidthToParquetConverter(input_file_path, output_file_path, fields)
+        converter.convert()
+
+        # Values are true unless they are a zero number, so unparsable values are true as NaN was
+        result_data = pd.read_parquet(output_file_path)
+        pd.testing.assert_frame_equal(result_data, expected_data)
+
+    def test_convert_float_special_values(self):
+        input_data = ["  1.5", "  inf", " -inf", "+Infinity", "  nan", "  abc"]
+        expected_data = pd.DataFrame({
+            'col1': [1.5, float('inf'), float('-inf'), float('inf'), None, None]
+        })
+
+        input_file_path = os.path.join(self.test_dir.name, 'input.txt')
+        output_file_path = os.path.join(self.test_dir.name, 'output.parquet')
+
+        with open(input_file_path, 'w') as f:
+            for item in input_data:
+                f.write("%s\n" % item)
+
+        fields = [
+            {'name': 'col1', 'length': 9, 'type': 'float'},
+        ]
+
+        converter = FixedWidthToParquetConverter(input_file_path, output_file_path, fields)
+        converter.convert()
+
+        # Infinities are kept and anything else that is not a number, NaN included, is stored as null
+        table = pq.read_table(output_file_path)
+        self.assertEqual(table.column('col1').null_count, 2)
+        pd.testing.assert_frame_equal(table.to_pandas(), expected_data)
+
+    def test_convert_date_type(self):
+        input_data = ["20240131  42", "20230231   7"]
+        expected_data = pd.DataFrame({
+            'col1': pd.to_datetime(['2024-01-31', None]).astype('datetime64[us]'),
+            'col2': [42, 7]
+        })
+
+        input_file_path = os.path.join(self.test_dir.name, 'input.txt')
+        output_file_path = os.path.join(self.test_dir.name, 'output.parquet')
+
+        with open(input_file_path, 'w') as f:
+            for item in input_data:
+                f.write("%s\n" % item)
+
+        fields = [
+            {'name': 'col1', 'length': 8, 'type': 'date', 'format': '%Y%m%d'},
+            {'name': 'col2', 'length': 4, 'type': 'int'},
+        ]
+
+        converter = FixedWidthToParquetConverter(input_file_path, output_file_path, fields)
+        converter.convert()
+
+        # Invalid dates are stored as nulls
+        result_data = pd.read_parquet(output_file_path)
+        pd.testing.assert_frame_equal(result_data, expected_data)
+
+    def test_convert_without_kernel_fields(self):
+        input_data = ["abc 01/02/2023", "de  29/02/2024"]
+        expected_data = pd.DataFrame({
+            'col1': ['abc', 'de'],
+            'col2': pd.to_datetime(['2023-02-01', '2024-02-29']).astype('datetime64[us]')
+        })
+
+        input_file_path = os.path.join(self.test_dir.name, 'input.txt')
+        output_file_path = os.path.join(self.test_dir.name, 'output.parquet')
+
+        with open(input_file_path, 'w') as f:
+            for item in input_data:
+                f.write("%s\n" % item)
+
+        # Neither field is decoded by the row parser
+        fields = [
+            {'name': 'col1', 'length': 4, 'type': 'string'},
+            {'name': 'col2', 'length': 10, 'type': 'date', 'format': '%d/%m/%Y'},
+        ]
+
+        converter = FixedWidthToParquetConverter(input_file_path, output_file_path, fields)
+        converter.convert()
+
+        result_data = pd.read_parquet(output_file_path)
+        pd.testing.assert_frame_equal(result_data, expected_data)
+
+    def test_convert_invalid_dates(self):
+        input_data = ["31/02/2023", "29/02/2024", "1/2/2023  ", "29/02/2023", "xx/02/2023"]
+        expected_data = pd.DataFrame({
+            'col1': pd.to_datetime([None, '2024-02-29', '2023-02-01', None, None]).astype('datetime64[us]')
+        })
+
+        input_file_path = os.path.join(self.test_dir.name, 'input.txt')
+        output_file_path = os.path.join(self.test_dir.name, 'output.parquet')
+
+        with open(input_file_path, 'w') as f:
+            for item in input_data:
+                f.write("%s\n" % item)
+
+        fields = [
+            {'name': 'col1', 'length': 10, 'type': 'date', 'format': '%d/%m/%Y'},
+        ]
+
+        converter = FixedWidthToParquetConverter(input_file_path, output_file_path, fields)
+        converter.convert()
+
+        # Dates past the end of their month are stored as nulls instead of rolling over
+        result_data = pd.read_parquet(output_file_path)
+        pd.testing.assert_frame_equal(result_data, expected_data)
+
+    def test_convert_signed_values_non_ascii_chunk(self):
+        input_data = ["  +42+00150ab", "  +42+00150é ", "  -42-00150é ", "  -42-00150ab"]
+        expected_data = pd.DataFrame({
+            'col1': [42, 42, -42, -42],
+            'col2': [1.5, 1.5, -1.5, -1.5],
+            'col3': ['ab', 'é', 'é', 'ab']
+        })
+
+        input_file_path = os.path.join(self.test_dir.name, 'input.txt')
+        output_file_path = os.path.join(self.test_dir.name, 'output.parquet')
+
+        with open(input_file_path, 'w', encoding='utf-8') as f:
+            for item in input_data:
+                f.write("%s\n" % item)
+
+        fields = [
+            {'name': 'col1', 'length': 5, 'type': 'int'},
+            {'name': 'col2', 'length': 6, 'type': 'fixed_monetary'},
+            {'name': 'col3', 'length': 2, 'type': 'string'},
+        ]
+
+        # One row per chunk, so the chunks with non-ASCII text are converted by Arrow compute
+        converter = FixedWidthToParquetConverter(input_file_path, output_file_path, fields, chunk_size=1)
+        converter.convert()
+
+        # Signs are accepted whatever the other columns of their chunk
+        result_data = pd.read_parquet(output_file_path)
+        pd.testing.assert_frame_equal(result_data, expected_data)
+
+    def test_convert_date_type_non_ascii_chunk(self):
+        input_data = ["20230231ab", "20230231é ", "20240229é ", "20240229ab"]
+        expected_data = pd.DataFrame({
+            'col1': pd.to_datetime([None, None, '2024-02-29', '2024-02-29']).astype('datetime64[us]'),
+            'col2': ['ab', 'é', 'é', 'ab']
+        })
+
+        input_file_path = os.path.join(self.test_dir.name, 'input.txt')
+        output_file_path = os.path.join(self.test_dir.name, 'output.parquet')
+
+        with open(input_file_path, 'w', encoding='utf-8') as f:
+            for item in input_data:
+                f.write("%s\n" % item)
+
+        fields = [
+            {'name': 'col1', 'length': 8, 'type': 'date', 'format': '%Y%m%d'},
+            {'name': 'col2', 'length': 2, 'type': 'string'},
+        ]
+
+        # One row per chunk, so the chunks with non-ASCII text are converted by Arrow compute
+        converter = FixedWidthToParquetConverter(input_file_path, output_file_path, fields, chunk_size=1)
+        converter.convert()
+
+        # Dates do not depend on the other columns of their chunk
+        result_data = pd.read_parquet(output_file_path)
+        pd.testing.assert_frame_equal(result_data, expected_data)
+
+    def test_unsupported_date_formats(self):
+        input_file_path = os.path.join(self.test_dir.name, 'input.txt')
+        output_file_path = os.path.join(self.test_dir.name, 'output.parquet')
+
+        # Fractional seconds cannot be parsed, and time zones do not fit the date columns
+        for col_format, directive in [('%Y-%m-%d %H:%M:%S.%f', '%f'), ('%Y-%m-%d %z', '%z'), ('%Y-%m-%d %Z', '%Z')]:
+            with self.subTest(format=col_format):
+                fields = [
+                    {'name': 'col1', 'length': 26, 'type': 'date', 'format': col_format},
+                ]
+
+                with self.assertRaisesRegex(ValueError, f"col1 uses the unsupported directives {directive}"):
+                    FixedWidthToParquetConverter(input_file_path, output_file_path, fields)
+
+        # A literal percent sign is not a directive
+        fields = [
+            {'name': 'col1', 'length': 11, 'type': 'date', 'format': '%Y%m%d%%f'},
+        ]
+        FixedWidthToParquetConverter(input_file_path, output_file_path, fields)
+
     def test_empty_input_file(self):
         input_file_path = os.path.join(self.test_dir.name, 'empty_input.txt')
         output_file_path = os.path.join(self.test_dir.name, 'output.parquet')
@@ -116,6 +505,224 @@ class TestFixedWidthToParquetConverter(unittest.TestCase):
 
         # Ensure the output file was attempted to be removed
         self.assertFalse(os.path.exists(output_file_path))
+        self.assertFalse(os.path.exists(output_file_path + '.part'))
+
+    def test_replace_existing_output(self):
+        input_file_path = os.path.join(self.test_dir.name, 'input.txt')
+        output_file_path = os.path.join(self.test_dir.name, 'output.parquet')
+
+        with open(output_file_path, 'wb') as f:
+            f.write(b'previous output')
+        with open(input_file_path, 'w') as f:
+            f.write("123456\n")
+
+        fields = [
+            {'name': 'col1', 'length': 6, 'type': 'int'},
+        ]
+
+        # The complete file is renamed over the previous output
+        converter = FixedWidthToParquetConverter(input_file_path, output_file_path, fields)
+        converter.convert()
+
+        result_data = pd.read_parquet(output_file_path)
+        pd.testing.assert_frame_equal(result_data, pd.DataFrame({'col1': [123456]}))
+        self.assertFalse(os.path.exists(output_file_path + '.part'))
+
+    def test_keep_existing_output_on_error(self):
+        input_file_path = os.path.join(self.test_dir.name, 'input.txt')
+        output_file_path = os.path.join(self.test_dir.name, 'output.parquet')
+
+        with open(input_file_path, 'w') as f:
+            f.write("123456\n")
+
+        fields = [
+            {'name': 'col1', 'length': 6, 'type': 'int'},
+        ]
+
+        converter = FixedWidthToParquetConverter(input_file_path, output_file_path, fields, chunk_size=1)
+        converter.convert()
+        with open(output_file_path, 'rb') as f:
+            previous_output = f.read()
+
+        # A failed rerun, once in the middle of the input and once when writing the footer
+        with open(input_file_path, 'w') as f:
+            f.write("654321\nabcdef\n")
+
+        with self.assertRaises(SystemExit):
+            converter.convert()
+
+        close = pq.ParquetWriter.close
+
+        def close_failing(writer):
+            if writer.is_open:
+                close(writer)
+                raise OSError('No space left on device')
+
+        with mock.patch.object(pq.ParquetWriter, 'close', close_failing):
+            with open(input_file_path, 'w') as f:
+                f.write("654321\n")
+            with self.assertRaises(SystemExit):
+                converter.convert()
+
+        with open(output_file_path, 'rb') as f:
+            self.assertEqual(f.read(), previous_output)
+        self.assertFalse(os.path.exists(output_file_path + '.part'))
+
+    def test_write_error(self):
+        input_file_path = os.path.join(self.test_dir.name, 'input.txt')
+        output_file_path = os.path.join(self.test_dir.name, 'output.parquet')
+
+        # More row groups than the queue of the writer thread holds
+        with open(input_file_path, 'w') as f:
+            for row in range(3 * WRITE_QUEUE_SIZE * BATCHES_PER_ROW_GROUP):
+                f.write("%6d\n" % row)
+
+        fields = [
+            {'name': 'col1', 'length': 6, 'type': 'int'},
+        ]
+
+        converter = FixedWidthToParquetConverter(input_file_path, output_file_path, fields, chunk_size=1)
+        exits = []
+
+        def convert():
+            try:
+                converter.convert()
+            except SystemExit as e:
+                exits.append(e)
+
+        def write_table(*args, **kwargs):
+            # Fail once the queue has filled up behind the first row group
+            time.sleep(0.5)
+            raise OSError('No space left on device')
+
+        # The writer thread keeps draining the queue after the failure, so the conversion ends
+        with mock.patch.object(pq.ParquetWriter, 'write_table', side_effect=write_table):
+            thread = threading.Thread(target=convert, daemon=True)
+            thread.start()
+            thread.join(timeout=60)
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(exits), 1)
+        self.assertFalse(os.path.exists(output_file_path))
+        self.assertFalse(os.path.exists(output_file_path + '.part'))
+
+    def test_invalid_encoding(self):
+        input_file_path = os.path.join(self.test_dir.name, 'input.txt')
+        output_file_path = os.path.join(self.test_dir.name, 'output.parquet')
+
+        # A Latin-1 byte in the middle of UTF-8 rows
+        with open(input_file_path, 'wb') as f:
+            f.write(b'abcd\n' * 5 + b'caf\xe9\n' + b'abcd\n' * 5)
+
+        fields = [
+            {'name': 'col1', 'length': 4, 'type': 'string'},
+        ]
+
+        # Encoding errors fail the conversion whether it is fault tolerant or not
+        for fault_tolerant in [True, False]:
+            with self.subTest(fault_tolerant=fault_tolerant):
+                converter = FixedWidthToParquetConverter(input_file_path, output_file_path, fields, chunk_size=3,
+                                                         fault_tolerant=fault_tolerant)
+                with self.assertRaises(SystemExit):
+                    converter.convert()
+
+                self.assertFalse(os.path.exists(output_file_path))
+                self.assertFalse(os.path.exists(output_file_path + '.part'))
+
+    def test_compression_options(self):
+        input_file_path = os.path.join(self.test_dir.name, 'input.txt')
+        output_file_path = os.path.join(self.test_dir.name, 'output.parquet')
+
+        with open(input_file_path, 'w') as f:
+            f.write("123456abc\n789012def\n")
+
+        fields = [
+            {'name': 'col1', 'length': 6, 'type': 'int'},
+            {'name': 'col2', 'length': 3, 'type': 'string'},
+        ]
+
+        # Only zstd gets a default level, other codecs use the library default unless one is given
+        cases = [
+            ({}, 'ZSTD', ZSTD_COMPRESSION_LEVEL, True),
+            ({'compression': 'zstd', 'compression_level': 7}, 'ZSTD', 7, True),
+            ({'compression': 'snappy'}, 'SNAPPY', None, True),
+            ({'compression': 'gzip', 'compression_level': 5, 'use_dictionary': False}, 'GZIP', 5, False),
+        ]
+        for options, codec, level, use_dictionary in cases:
+            with self.subTest(options=options):
+                converter = FixedWidthToParquetConverter(input_file_path, output_file_path, fields, **options)
+                self.assertEqual(converter.writer_options().get('compression_level'), level)
+                converter.convert()
+
+                metadata = pq.ParquetFile(output_file_path).metadata
+                for index in range(metadata.num_columns):
+                    column = metadata.row_group(0).column(index)
+                    self.assertEqual(column.compression, codec)
+                    self.assertEqual(column.has_dictionary_page, use_dictionary)
+
+
+class TestConfigLoader(unittest.TestCase):
+
+    def setUp(self):
+        self.test_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.test_dir.cleanup()
+
+    def write_config(self, options):
+        config_file_path = os.path.join(self.test_dir.name, 'config.yaml')
+        with open(config_file_path, 'w') as f:
+            f.write("input: input.txt\n"
+                    "output: output.parquet\n"
+                    "fault_tolerant: true\n"
+                    "fields:\n"
+                    "  - {name: col1, length: 6, type: int}\n")
+            f.write(options)
+        return config_file_path
+
+    def test_from_yaml_compression_options(self):
+        config_file_path = self.write_config("compression: gzip\n"
+                                             "compression_level: 5\n"
+                                             "use_dictionary: false\n")
+        (_, _, fields, chunk_size, _,
+         compression, compression_level, use_dictionary) = ConfigLoader.from_yaml(config_file_path)
+
+        self.assertEqual(fields, [{'name': 'col1', 'length': 6, 'type': 'int'}])
+        self.assertIsNone(chunk_size)
+        self.assertEqual((compression, compression_level, use_dictionary), ('gzip', 5, False))
+
+    def test_from_yaml_default_compression_options(self):
+        config_file_path = self.write_config("")
+        (_, _, _, _, _,
+         compression, compression_level, use_dictionary) = ConfigLoader.from_yaml(config_file_path)
+
+        self.assertEqual((compression, compression_level, use_dictionary), ('zstd', None, True))
+
+    def test_command_line_compression_options(self):
+        input_file_path = os.path.join(self.test_dir.name, 'input.txt')
+        output_file_path = os.path.join(self.test_dir.name, 'output.parquet')
+
+        with open(input_file_path, 'w') as f:
+            f.write("123456\n789012\n")
+
+        argv = ['flen2pq', '--input_file', input_file_path, '--output_file', output_file_path,
+                '--column_names', 'col1', '--column_widths', '6', '--column_types', 'int',
+                '--compression', 'gzip', '--compression_level', '5', '--no-use_dictionary']
+        with mock.patch.object(sys, 'argv', argv):
+            main()
+
+        column = pq.ParquetFile(output_file_path).metadata.row_group(0).column(0)
+        self.assertEqual(column.compression, 'GZIP')
+        self.assertFalse(column.has_dictionary_page)
+
+
+@unittest.skipIf(_parse is None, 'flen2pq._parse is not built')
+class TestFixedWidthToParquetConverterCompiled(TestFixedWidthToParquetConverter):
+    """Run the same conversions with the column functions of the compiled extension."""
+
+    def setUp(self):
+        super().setUp()
+        self.use_backend(_parse)
 
 
 if __name__ == '__main__':